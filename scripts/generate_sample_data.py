@@ -7,14 +7,12 @@ import pandas as pd
 import numpy as np
 from faker import Faker
 from datetime import datetime, timedelta
-import random
+from multiprocessing import Pool
 import os
 
-# Set random seed for reproducibility
-np.random.seed(42)
-random.seed(42)
-fake = Faker(['es_ES', 'es_MX', 'en_US'])
-Faker.seed(42)
+# Base random seed for reproducibility (each chunk derives its own from it)
+SEED = 42
+LOCALES = ['es_ES', 'es_MX', 'en_US']
 
 # Configuration
 NUM_CUSTOMERS = 1000
@@ -23,59 +21,138 @@ NUM_SALES = 50000
 START_DATE = datetime(2023, 1, 1)
 END_DATE = datetime(2024, 10, 11)
 
-# Output paths
+# Parallelism: rows are generated in fixed-size chunks so the output does not
+# depend on how many worker processes are available
+CHUNK_SIZE = 10000
+NUM_WORKERS = os.cpu_count() or 1
+
+# Output paths (Parquet is the primary format; CSV copies are for human inspection)
 OUTPUT_DIR = 'data/raw'
+WRITE_CSV = False
 os.makedirs(OUTPUT_DIR, exist_ok=True)
 
+# Random generators owned by the current worker process; _seed_chunk replaces
+# them at the start of every chunk (PCG64 via the modern Generator API)
+rng = np.random.default_rng(SEED)
+fake = None
 
-def generate_customers(n=NUM_CUSTOMERS):
-    """Generate customer data with realistic information and data quality issues."""
-    print(f"Generating {n} customers...")
 
-    countries = ['Mexico', 'Spain', 'Argentina', 'Colombia', 'Chile', 'Peru', 'USA', 'Brazil']
-    segments = ['Premium', 'Standard', 'Basic']
-    segment_weights = [0.2, 0.5, 0.3]  # 20% Premium, 50% Standard, 30% Basic
+def _init_worker():
+    """Create the per-process Faker instance when a pool worker starts."""
+    global fake
+    fake = Faker(LOCALES)
+
 
-    customers = []
-    for i in range(1, n + 1):
-        reg_date = fake.date_between(start_date=START_DATE, end_date=END_DATE)
+def _seed_chunk(seed):
+    """Reseed every random source so a chunk depends only on its own seed."""
+    global rng
+    rng = np.random.default_rng(seed)
+    fake.seed_instance(seed)
 
-        # Introduce data quality issues
-        # 3% missing emails
-        email = fake.email() if np.random.random() > 0.03 else None
 
-        # 2% missing phone numbers
-        phone = fake.phone_number() if np.random.random() > 0.02 else None
+def _chunk_specs(n, first_id, seed):
+    """Split n rows into (start_id, count, seed) tasks with disjoint id ranges."""
+    starts = range(0, n, CHUNK_SIZE)
+    seeds = np.random.SeedSequence(seed).generate_state(len(starts))
+    return [
+        (first_id + start, min(CHUNK_SIZE, n - start), int(chunk_seed))
+        for start, chunk_seed in zip(starts, seeds)
+    ]
 
-        # 1% missing city
-        city = fake.city() if np.random.random() > 0.01 else None
 
-        # 0.5% invalid email formats (for testing validation)
-        if email and np.random.random() < 0.005:
-            email = fake.user_name() + "@invalid"  # Missing domain
+def _run_chunks(worker, specs, *args):
+    """Run worker over every chunk spec in a process pool and concatenate the results."""
+    # A single chunk gains nothing from a pool, so skip process start-up and pickling
+    if len(specs) == 1:
+        _init_worker()
+        return worker(*specs[0], *args)
 
-        # 1% duplicate emails (realistic issue)
-        if i > 10 and np.random.random() < 0.01:
-            email = customers[np.random.randint(0, len(customers))]['email']
+    processes = max(1, min(NUM_WORKERS, len(specs)))
+    with Pool(processes=processes, initializer=_init_worker) as pool:
+        frames = pool.starmap(worker, [spec + args for spec in specs])
+    return pd.concat(frames, ignore_index=True)
 
-        customers.append({
-            'customer_id': i,
-            'name': fake.name(),
-            'email': email,
-            'country': np.random.choice(countries),
-            'registration_date': reg_date,
-            'segment': np.random.choice(segments, p=segment_weights),
-            'phone': phone,
-            'city': city
-        })
 
-    df = pd.DataFrame(customers)
+def random_dates(n, start_date, end_date):
+    """Draw n uniform dates in [start_date, end_date] with a single NumPy call."""
+    # Returned as midnight timestamps; use as_dates() before building a column
+    num_days = (end_date - start_date).days
+    offsets = rng.integers(0, num_days + 1, size=n)
+    return pd.to_datetime(start_date) + pd.to_timedelta(offsets, unit='D')
+
+
+def as_dates(timestamps):
+    """Convert timestamps to a calendar-date column (Parquet DATE, nulls kept)."""
+    return pd.Series(timestamps).astype('date32[pyarrow]').to_numpy()
+
+
+def generate_customers(n=NUM_CUSTOMERS):
+    """Generate customer data with realistic information and data quality issues."""
+    print(f"Generating {n} customers...")
+    return _run_chunks(_generate_customers_chunk, _chunk_specs(n, 1, SEED))
+
+
+def _generate_customers_chunk(start_id, n, seed):
+    """Generate n customers with ids starting at start_id."""
+    _seed_chunk(seed)
+
+    countries = ['Mexico', 'Spain', 'Argentina', 'Colombia', 'Chile', 'Peru', 'USA', 'Brazil']
+    segments = ['Premium', 'Standard', 'Basic']
+    segment_weights = [0.2, 0.5, 0.3]  # 20% Premium, 50% Standard, 30% Basic
+
+    # Faker has no batch API, so text fields are built with comprehensions
+    names = [fake.name() for _ in range(n)]
+    emails = np.array([fake.email() for _ in range(n)], dtype=object)
+    phones = np.array([fake.phone_number() for _ in range(n)], dtype=object)
+    cities = np.array([fake.city() for _ in range(n)], dtype=object)
+    reg_dates = random_dates(n, START_DATE, END_DATE)
+
+    # Draw every random decision in one batch: one column per quality issue
+    # (missing email, missing phone, missing city, invalid email, duplicate email)
+    quality = rng.random((n, 5))
+
+    # Introduce data quality issues
+    # 3% missing emails
+    emails = np.where(quality[:, 0] > 0.03, emails, None)
+
+    # 2% missing phone numbers
+    phones = np.where(quality[:, 1] > 0.02, phones, None)
+
+    # 1% missing city
+    cities = np.where(quality[:, 2] > 0.01, cities, None)
+
+    # 0.5% invalid email formats (for testing validation)
+    invalid = (quality[:, 3] < 0.005) & pd.notna(emails)
+    emails[invalid] = [fake.user_name() + "@invalid" for _ in range(invalid.sum())]  # Missing domain
+
+    # 1% duplicate emails (realistic issue), copied from other customers
+    duplicate = quality[:, 4] < 0.01
+    duplicate[:10] = False
+    source = rng.integers(0, n, size=n)
+    emails[duplicate] = emails[source[duplicate]]
+
+    df = pd.DataFrame({
+        'customer_id': np.arange(start_id, start_id + n),
+        'name': names,
+        'email': emails,
+        'country': rng.choice(countries, size=n),
+        'registration_date': as_dates(reg_dates),
+        'segment': rng.choice(segments, size=n, p=segment_weights),
+        'phone': phones,
+        'city': cities
+    })
     return df
 
 
 def generate_products(n=NUM_PRODUCTS):
     """Generate product catalog with various categories and data quality issues."""
     print(f"Generating {n} products...")
+    return _run_chunks(_generate_products_chunk, _chunk_specs(n, 101, SEED + 1))
+
+
+def _generate_products_chunk(start_id, n, seed):
+    """Generate n products with ids starting at start_id."""
+    _seed_chunk(seed)
 
     categories = {
         'Electronics': ['Laptop', 'Smartphone', 'Tablet', 'Headphones', 'Smartwatch', 'Camera', 'Speaker', 'Monitor'],
@@ -86,69 +163,60 @@ def generate_products(n=NUM_PRODUCTS):
         'Beauty': ['Perfume', 'Skincare Set', 'Makeup Kit', 'Hair Dryer', 'Electric Razor']
     }
 
+    # Price varies by category (min, max)
+    price_ranges = {
+        'Electronics': (200, 2000),
+        'Clothing': (30, 300),
+        'Home': (50, 800),
+        'Sports': (25, 500),
+        'Books': (10, 50),
+        'Beauty': (20, 200)
+    }
+
     brands = ['Samsung', 'Apple', 'Sony', 'Nike', 'Adidas', 'Dell', 'HP', 'Canon',
               'LG', 'Microsoft', 'Bose', 'JBL', 'Puma', 'Reebok', 'Logitech']
 
-    products = []
-    product_id = 101
-
-    for _ in range(n):
-        category = random.choice(list(categories.keys()))
-        product_type = random.choice(categories[category])
-        brand = random.choice(brands)
-
-        # Price varies by category
-        if category == 'Electronics':
-            base_price = np.random.uniform(200, 2000)
-        elif category == 'Clothing':
-            base_price = np.random.uniform(30, 300)
-        elif category == 'Home':
-            base_price = np.random.uniform(50, 800)
-        elif category == 'Sports':
-            base_price = np.random.uniform(25, 500)
-        elif category == 'Books':
-            base_price = np.random.uniform(10, 50)
-        else:  # Beauty
-            base_price = np.random.uniform(20, 200)
-
-        # Data quality issues
-        # 1% missing supplier
-        supplier = brand if np.random.random() > 0.01 else None
-
-        # 2% negative or zero stock (inventory issues)
-        if np.random.random() < 0.02:
-            stock = np.random.randint(-10, 0)
-        else:
-            stock = np.random.randint(10, 500)
-
-        # 0.5% negative prices (data entry errors)
-        if np.random.random() < 0.005:
-            price = -round(base_price, 2)
-        else:
-            price = round(base_price, 2)
-
-        # 1% missing weight
-        weight = round(np.random.uniform(0.1, 5.0), 2) if np.random.random() > 0.01 else None
-
-        # 0.5% invalid ratings (outside 0-5 range)
-        if np.random.random() < 0.005:
-            rating = round(np.random.uniform(5.5, 10.0), 1)
-        else:
-            rating = round(np.random.uniform(3.5, 5.0), 1)
-
-        products.append({
-            'product_id': product_id,
-            'product_name': f"{brand} {product_type}",
-            'category': category,
-            'unit_price': price,
-            'supplier': supplier,
-            'stock_quantity': stock,
-            'weight_kg': weight,
-            'rating': rating
-        })
-        product_id += 1
-
-    df = pd.DataFrame(products)
+    # Each column is drawn as a whole array; per-category values use masks
+    category = rng.choice(list(categories.keys()), size=n)
+    brand = rng.choice(brands, size=n)
+    product_type = np.empty(n, dtype=object)
+    base_price = np.empty(n)
+    for name, types in categories.items():
+        mask = category == name
+        product_type[mask] = rng.choice(types, size=mask.sum())
+        base_price[mask] = rng.uniform(*price_ranges[name], size=mask.sum())
+
+    # Data quality issues
+    # 1% missing supplier
+    supplier = np.where(rng.random(n) > 0.01, brand, None)
+
+    # 2% negative or zero stock (inventory issues)
+    stock = np.where(rng.random(n) < 0.02,
+                     rng.integers(-10, 0, size=n),
+                     rng.integers(10, 500, size=n))
+
+    # 0.5% negative prices (data entry errors)
+    price = np.round(base_price, 2)
+    price = np.where(rng.random(n) < 0.005, -price, price)
+
+    # 1% missing weight
+    weight = np.where(rng.random(n) > 0.01, np.round(rng.uniform(0.1, 5.0, size=n), 2), np.nan)
+
+    # 0.5% invalid ratings (outside 0-5 range)
+    rating = np.where(rng.random(n) < 0.005,
+                      np.round(rng.uniform(5.5, 10.0, size=n), 1),
+                      np.round(rng.uniform(3.5, 5.0, size=n), 1))
+
+    df = pd.DataFrame({
+        'product_id': np.arange(start_id, start_id + n),
+        'product_name': [f"{b} {t}" for b, t in zip(brand, product_type)],
+        'category': category,
+        'unit_price': price,
+        'supplier': supplier,
+        'stock_quantity': stock,
+        'weight_kg': weight,
+        'rating': rating
+    })
     return df
 
 
@@ -163,80 +231,99 @@ def generate_sales(n=NUM_SALES, customers_df=None, products_df=None):
     product_ids = products_df['product_id'].tolist()
 
     # Premium customers buy more frequently
-    customer_segments = customers_df.set_index('customer_id')['segment'].to_dict()
-
-    sales = []
-    for sale_id in range(1001, 1001 + n):
-        # Select customer with bias towards premium customers
-        customer_id = random.choice(customer_ids)
-        segment = customer_segments[customer_id]
-
-        # Premium customers buy more items
-        if segment == 'Premium':
-            quantity = np.random.choice([1, 2, 3, 4, 5], p=[0.3, 0.3, 0.2, 0.1, 0.1])
-        elif segment == 'Standard':
-            quantity = np.random.choice([1, 2, 3], p=[0.5, 0.3, 0.2])
-        else:  # Basic
-            quantity = np.random.choice([1, 2], p=[0.7, 0.3])
-
-        # Generate random date with some seasonal patterns
-        date = fake.date_between(start_date=START_DATE, end_date=END_DATE)
-
-        # Higher discounts during certain months (Black Friday, holidays)
-        month = date.month
-        if month in [11, 12]:  # Holiday season
-            discount = np.random.choice([0, 5, 10, 15, 20], p=[0.3, 0.2, 0.2, 0.2, 0.1])
-        else:
-            discount = np.random.choice([0, 5, 10], p=[0.6, 0.3, 0.1])
-
-        # Data quality issues in sales
-        # 0.5% orphaned customer_ids (referential integrity issue)
-        if np.random.random() < 0.005:
-            customer_id = 9999  # Non-existent customer
-
-        # 0.5% orphaned product_ids (referential integrity issue)
-        product_id = random.choice(product_ids)
-        if np.random.random() < 0.005:
-            product_id = 9999  # Non-existent product
-
-        # 1% negative quantities (data entry errors)
-        if np.random.random() < 0.01:
-            quantity = -quantity
-
-        # 0.5% discounts > 100% (logical errors)
-        if np.random.random() < 0.005:
-            discount = np.random.randint(101, 150)
-
-        # 2% missing dates
-        if np.random.random() < 0.02:
-            date = None
-
-        # 1% future dates (logical errors)
-        if date and np.random.random() < 0.01:
-            date = fake.date_between(start_date=END_DATE, end_date=datetime(2026, 12, 31))
-
-        # 0.5% duplicate sale_ids
-        if sale_id > 2000 and np.random.random() < 0.005:
-            sale_id = sales[np.random.randint(0, len(sales))]['sale_id']
-
-        sales.append({
-            'sale_id': sale_id,
-            'customer_id': customer_id,
-            'product_id': product_id,
-            'date': date,
-            'quantity': quantity,
-            'discount_percent': discount,
-            'payment_method': np.random.choice(['Credit Card', 'Debit Card', 'PayPal', 'Cash'],
-                                              p=[0.5, 0.25, 0.15, 0.1]),
-            'status': np.random.choice(['Completed', 'Shipped', 'Processing', 'Cancelled'],
-                                      p=[0.85, 0.10, 0.03, 0.02])
-        })
-
-    df = pd.DataFrame(sales)
+    customer_segments = customers_df.set_index('customer_id')['segment']
+
+    df = _run_chunks(
+        _generate_sales_chunk,
+        _chunk_specs(n, 1001, SEED + 2),
+        customer_ids,
+        customer_segments,
+        product_ids
+    )
     df = df.sort_values('date').reset_index(drop=True)
     return df
 
 
+def _generate_sales_chunk(start_id, n, seed, customer_ids, customer_segments, product_ids):
+    """Generate n sales with ids starting at start_id."""
+    _seed_chunk(seed)
+
+    # Generate random dates with some seasonal patterns (months drive discounts)
+    dates = random_dates(n, START_DATE, END_DATE)
+    months = dates.month
+
+    # 1% future dates (logical errors)
+    future = rng.random(n) < 0.01
+    dates = dates.where(~future, random_dates(n, END_DATE, datetime(2026, 12, 31)))
+
+    # 2% missing dates
+    missing = rng.random(n) < 0.02
+    dates = dates.where(~missing)
+
+    # Columns are filled as typed arrays rather than a list of per-row dicts
+    sale_ids = np.arange(start_id, start_id + n, dtype=np.int64)
+    customer_id = rng.choice(customer_ids, size=n)
+    product_id = rng.choice(product_ids, size=n)
+    quantity = np.empty(n, dtype=np.int16)
+    discount = np.empty(n, dtype=np.int16)
+    payment = rng.choice(['Credit Card', 'Debit Card', 'PayPal', 'Cash'],
+                         size=n, p=[0.5, 0.25, 0.15, 0.1])
+    status = rng.choice(['Completed', 'Shipped', 'Processing', 'Cancelled'],
+                        size=n, p=[0.85, 0.10, 0.03, 0.02])
+
+    # Premium customers buy more items (one batched draw per segment)
+    segments = customer_segments.reindex(customer_id).to_numpy()
+    quantity_choices = {
+        'Premium': ([1, 2, 3, 4, 5], [0.3, 0.3, 0.2, 0.1, 0.1]),
+        'Standard': ([1, 2, 3], [0.5, 0.3, 0.2])
+    }
+    basic = ~np.isin(segments, list(quantity_choices))  # Basic (or any other segment)
+    quantity[basic] = rng.choice([1, 2], size=basic.sum(), p=[0.7, 0.3])
+    for segment, (values, weights) in quantity_choices.items():
+        mask = segments == segment
+        quantity[mask] = rng.choice(values, size=mask.sum(), p=weights)
+
+    # Higher discounts during certain months (Black Friday, holidays)
+    holiday = np.isin(months, [11, 12])  # Holiday season
+    discount[holiday] = rng.choice([0, 5, 10, 15, 20], size=holiday.sum(),
+                                   p=[0.3, 0.2, 0.2, 0.2, 0.1])
+    discount[~holiday] = rng.choice([0, 5, 10], size=(~holiday).sum(),
+                                    p=[0.6, 0.3, 0.1])
+
+    # Data quality issues in sales
+    # 0.5% orphaned customer_ids (referential integrity issue)
+    customer_id[rng.random(n) < 0.005] = 9999  # Non-existent customer
+
+    # 0.5% orphaned product_ids (referential integrity issue)
+    product_id[rng.random(n) < 0.005] = 9999  # Non-existent product
+
+    # 1% negative quantities (data entry errors)
+    negative = rng.random(n) < 0.01
+    quantity[negative] = -quantity[negative]
+
+    # 0.5% discounts > 100% (logical errors)
+    excessive = rng.random(n) < 0.005
+    discount[excessive] = rng.integers(101, 150, size=excessive.sum())
+
+    # 0.5% duplicate sale_ids, copied from an earlier sale in the chunk
+    duplicate = (rng.random(n) < 0.005) & (sale_ids > 2000)
+    duplicate[0] = False
+    earlier = (rng.random(n) * np.arange(n)).astype(np.int64)
+    sale_ids[duplicate] = sale_ids[earlier[duplicate]]
+
+    df = pd.DataFrame({
+        'sale_id': sale_ids,
+        'customer_id': customer_id,
+        'product_id': product_id,
+        'date': as_dates(dates),
+        'quantity': quantity,
+        'discount_percent': discount,
+        'payment_method': payment,
+        'status': status
+    })
+    return df
+
+
 def main():
     """Main function to generate all datasets."""
     print("=" * 60)
@@ -248,16 +335,16 @@ def main():
     products_df = generate_products()
     sales_df = generate_sales(customers_df=customers_df, products_df=products_df)
 
-    # Save to CSV
-    print("\nSaving data to CSV files...")
-    customers_df.to_csv(f'{OUTPUT_DIR}/customers.csv', index=False)
-    print(f"✓ Saved {len(customers_df)} customers to {OUTPUT_DIR}/customers.csv")
-
-    products_df.to_csv(f'{OUTPUT_DIR}/products.csv', index=False)
-    print(f"✓ Saved {len(products_df)} products to {OUTPUT_DIR}/products.csv")
+    # Save to Parquet (and optionally CSV)
+    print("\nSaving data to Parquet files...")
+    datasets = {'customers': customers_df, 'products': products_df, 'sales': sales_df}
+    for name, df in datasets.items():
+        df.to_parquet(f'{OUTPUT_DIR}/{name}.parquet', index=False, compression='snappy')
+        print(f"✓ Saved {len(df)} {name} to {OUTPUT_DIR}/{name}.parquet")
 
-    sales_df.to_csv(f'{OUTPUT_DIR}/sales.csv', index=False)
-    print(f"✓ Saved {len(sales_df)} sales to {OUTPUT_DIR}/sales.csv")
+        if WRITE_CSV:
+            df.to_csv(f'{OUTPUT_DIR}/{name}.csv', index=False)
+            print(f"✓ Saved {len(df)} {name} to {OUTPUT_DIR}/{name}.csv")
 
     # Print summary statistics
     print("\n" + "=" * 60)
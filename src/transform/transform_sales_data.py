@@ -7,9 +7,86 @@ from pyspark.sql import SparkSession
 from pyspark.sql import functions as F
 from pyspark.sql.types import *
 from pyspark.sql.window import Window
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
 import sys
 import os
 
+# Basic email format check
+EMAIL_PATTERN = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
+
+# Raw data schemas (declared up front so Spark reads each CSV in one pass
+# instead of scanning it a second time to infer types; Parquet input is cast to them)
+CUSTOMERS_SCHEMA = StructType([
+    StructField("customer_id", IntegerType()),
+    StructField("name", StringType()),
+    StructField("email", StringType()),
+    StructField("country", StringType()),
+    StructField("registration_date", DateType()),
+    StructField("segment", StringType()),
+    StructField("phone", StringType()),
+    StructField("city", StringType())
+])
+
+PRODUCTS_SCHEMA = StructType([
+    StructField("product_id", IntegerType()),
+    StructField("product_name", StringType()),
+    StructField("category", StringType()),
+    StructField("unit_price", DoubleType()),
+    StructField("supplier", StringType()),
+    StructField("stock_quantity", IntegerType()),
+    StructField("weight_kg", DoubleType()),
+    StructField("rating", DoubleType())
+])
+
+SALES_SCHEMA = StructType([
+    StructField("sale_id", IntegerType()),
+    StructField("customer_id", IntegerType()),
+    StructField("product_id", IntegerType()),
+    StructField("date", DateType()),
+    StructField("quantity", IntegerType()),
+    StructField("discount_percent", IntegerType()),
+    StructField("payment_method", StringType()),
+    StructField("status", StringType())
+])
+
+# Star schema column types, matching sql/create_tables.sql so the Parquet
+# output loads with Redshift's COPY ... FORMAT AS PARQUET
+DIM_CUSTOMER_TYPES = {
+    "customer_id": IntegerType(),
+    "name": StringType(),
+    "email": StringType(),
+    "country": StringType(),
+    "registration_date": DateType(),
+    "segment": StringType(),
+    "city": StringType()
+}
+
+DIM_PRODUCT_TYPES = {
+    "product_id": IntegerType(),
+    "product_name": StringType(),
+    "category": StringType(),
+    "unit_price": DecimalType(10, 2),
+    "supplier": StringType(),
+    "rating": DecimalType(3, 1)
+}
+
+FACT_SALES_TYPES = {
+    "sale_id": IntegerType(),
+    "customer_id": IntegerType(),
+    "product_id": IntegerType(),
+    "sale_date": DateType(),
+    "quantity": IntegerType(),
+    "unit_price": DecimalType(10, 2),
+    "discount_percent": DecimalType(5, 2),
+    "amount_before_discount": DecimalType(12, 2),
+    "discount_amount": DecimalType(12, 2),
+    "total_amount": DecimalType(12, 2),
+    "payment_method": StringType(),
+    "status": StringType()
+}
+
 
 def create_spark_session(app_name="SalesDataETL"):
     """Create and configure Spark session"""
@@ -17,12 +94,57 @@ def create_spark_session(app_name="SalesDataETL"):
         .appName(app_name) \
         .config("spark.sql.adaptive.enabled", "true") \
         .config("spark.sql.adaptive.coalescePartitions.enabled", "true") \
+        .config("spark.sql.parquet.compression.codec", "snappy") \
         .getOrCreate()
     
     spark.sparkContext.setLogLevel("WARN")
     return spark
 
 
+def read_raw(spark, name, schema):
+    """
+    Read a raw dataset, preferring the generator's Parquet output over CSV.
+    
+    Parquet columns are cast to the declared schema so both sources yield
+    the same types (the generator writes int64/int16 columns and timestamps).
+    """
+    parquet_path = f"data/raw/{name}.parquet"
+    if os.path.exists(parquet_path):
+        return spark.read.parquet(parquet_path).select(*[
+            F.col(field.name).cast(field.dataType).alias(field.name)
+            for field in schema.fields
+        ])
+    
+    return spark.read.csv(f"data/raw/{name}.csv", header=True, schema=schema)
+
+
+def keep_first(df, key, order_by):
+    """
+    Keep one row per key: the one with the smallest order_by value.
+    
+    Ties are broken by the remaining columns in name order, so the result
+    is deterministic and matches the pandas pipeline.
+    """
+    others = sorted(c for c in df.columns if c not in (key, order_by))
+    window_spec = Window.partitionBy(key).orderBy(order_by, *others)
+    return df.withColumn("row_num", F.row_number().over(window_spec)) \
+        .filter(F.col("row_num") == 1) \
+        .drop("row_num")
+
+
+@F.pandas_udf(BooleanType())
+def is_valid_email(emails: pd.Series) -> pd.Series:
+    """
+    Validate a whole Arrow batch of emails at once (nulls are invalid).
+    
+    pyarrow.compute matches with RE2 in native code over the entire
+    array, rather than calling Python's re once per element.
+    """
+    emails = pa.array(emails, type=pa.string(), from_pandas=True)
+    matches = pc.match_substring_regex(emails, EMAIL_PATTERN)
+    return pc.fill_null(matches, False).to_pandas()
+
+
 def clean_customers(spark_df):
     """
     Clean customer data using PySpark.
@@ -32,19 +154,14 @@ def clean_customers(spark_df):
     - Remove duplicates
     """
     print("Cleaning customers data...")
-    initial_count = spark_df.count()
-    
-    # Remove records with missing emails
-    cleaned = spark_df.filter(F.col("email").isNotNull())
     
-    # Validate email format (basic regex)
-    email_pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-    cleaned = cleaned.filter(F.col("email").rlike(email_pattern))
+    # Remove records with missing or invalid emails in a single filter
+    cleaned = spark_df.filter(
+        F.col("email").isNotNull() & is_valid_email(F.col("email"))
+    )
     
-    # Remove duplicate emails (keep first)
-    window_spec = Window.partitionBy("email").orderBy("customer_id")
-    cleaned = cleaned.withColumn("row_num", F.row_number().over(window_spec))
-    cleaned = cleaned.filter(F.col("row_num") == 1).drop("row_num")
+    # Remove duplicate emails (keep lowest customer_id)
+    cleaned = keep_first(cleaned, "email", "customer_id")
     
     # Fill missing values
     cleaned = cleaned.fillna({
@@ -58,10 +175,6 @@ def clean_customers(spark_df):
         F.to_date(F.col("registration_date"))
     )
     
-    final_count = cleaned.count()
-    print(f"  Removed {initial_count - final_count} invalid customer records")
-    print(f"  Remaining: {final_count} customers")
-    
     return cleaned
 
 
@@ -74,7 +187,6 @@ def clean_products(spark_df):
     - Validate ratings
     """
     print("Cleaning products data...")
-    initial_count = spark_df.count()
     
     # Remove products with non-positive prices
     cleaned = spark_df.filter(F.col("unit_price") > 0)
@@ -89,16 +201,24 @@ def clean_products(spark_df):
     # Fill missing supplier
     cleaned = cleaned.fillna({"supplier": "Unknown"})
     
-    # Fill missing weight with category median
-    weight_medians = cleaned.groupBy("category") \
-        .agg(F.percentile_approx("weight_kg", 0.5).alias("median_weight"))
-    
-    cleaned = cleaned.join(weight_medians, "category", "left")
+    # Fill missing weight with category median. There are only a handful of
+    # categories, so collect the medians and look them up from a literal map
+    # instead of joining them back (no shuffle)
+    median_rows = cleaned.groupBy("category") \
+        .agg(F.percentile_approx("weight_kg", 0.5).alias("median_weight")) \
+        .collect()
+    weight_medians = {
+        row["category"]: row["median_weight"]
+        for row in median_rows
+        if row["category"] is not None
+    }
+    median_by_category = F.create_map(
+        [F.lit(value) for pair in weight_medians.items() for value in pair]
+    )
     cleaned = cleaned.withColumn(
         "weight_kg",
-        F.when(F.col("weight_kg").isNull(), F.col("median_weight"))
-         .otherwise(F.col("weight_kg"))
-    ).drop("median_weight")
+        F.coalesce(F.col("weight_kg"), median_by_category[F.col("category")])
+    )
     
     # Fix invalid ratings (cap between 0 and 5)
     cleaned = cleaned.withColumn(
@@ -108,10 +228,6 @@ def clean_products(spark_df):
          .otherwise(F.col("rating"))
     )
     
-    final_count = cleaned.count()
-    print(f"  Removed {initial_count - final_count} invalid product records")
-    print(f"  Remaining: {final_count} products")
-    
     return cleaned
 
 
@@ -126,21 +242,18 @@ def clean_sales(spark_df, valid_customers_df, valid_products_df):
     - Remove duplicates
     """
     print("Cleaning sales data...")
-    initial_count = spark_df.count()
-    
-    # Remove sales with missing dates
-    cleaned = spark_df.filter(F.col("date").isNotNull())
-    
-    # Convert to date type
-    cleaned = cleaned.withColumn("date", F.to_date(F.col("date")))
     
-    # Remove future dates
-    cleaned = cleaned.filter(F.col("date") <= F.current_date())
+    # Convert to date type and remove missing/future dates in one projection
+    cleaned = spark_df.select(*[
+        F.to_date(F.col("date")).alias("date") if column == "date" else column
+        for column in spark_df.columns
+    ]).where(F.col("date").isNotNull() & (F.col("date") <= F.current_date()))
     
     # Remove orphaned customer_ids (inner join keeps only valid)
+    # Dimension tables are small, so broadcast them to avoid a shuffle
     valid_customer_ids = valid_customers_df.select("customer_id")
     cleaned = cleaned.join(
-        valid_customer_ids, 
+        F.broadcast(valid_customer_ids), 
         "customer_id", 
         "inner"
     )
@@ -148,7 +261,7 @@ def clean_sales(spark_df, valid_customers_df, valid_products_df):
     # Remove orphaned product_ids
     valid_product_ids = valid_products_df.select("product_id")
     cleaned = cleaned.join(
-        valid_product_ids,
+        F.broadcast(valid_product_ids),
         "product_id",
         "inner"
     )
@@ -164,14 +277,8 @@ def clean_sales(spark_df, valid_customers_df, valid_products_df):
          .otherwise(F.col("discount_percent"))
     )
     
-    # Remove duplicate sale_ids (keep first)
-    window_spec = Window.partitionBy("sale_id").orderBy("date")
-    cleaned = cleaned.withColumn("row_num", F.row_number().over(window_spec))
-    cleaned = cleaned.filter(F.col("row_num") == 1).drop("row_num")
-    
-    final_count = cleaned.count()
-    print(f"  Removed {initial_count - final_count} invalid sales records")
-    print(f"  Remaining: {final_count} sales")
+    # Remove duplicate sale_ids (keep earliest date)
+    cleaned = keep_first(cleaned, "sale_id", "date")
     
     return cleaned
 
@@ -186,48 +293,31 @@ def create_star_schema(customers_df, products_df, sales_df):
     print("Creating star schema...")
     
     # Dimension: Customers
-    dim_customer = customers_df.select(
-        "customer_id",
-        "name",
-        "email",
-        "country",
-        "registration_date",
-        "segment",
-        "city"
-    )
+    dim_customer = customers_df.select(*[
+        F.col(column).cast(data_type).alias(column)
+        for column, data_type in DIM_CUSTOMER_TYPES.items()
+    ])
     
     # Dimension: Products
-    dim_product = products_df.select(
-        "product_id",
-        "product_name",
-        "category",
-        "unit_price",
-        "supplier",
-        "rating"
-    )
+    dim_product = products_df.select(*[
+        F.col(column).cast(data_type).alias(column)
+        for column, data_type in DIM_PRODUCT_TYPES.items()
+    ])
     
     # Fact: Sales with calculated metrics
     fact_sales = sales_df.join(
-        products_df.select("product_id", "unit_price"),
+        F.broadcast(products_df.select("product_id", "unit_price")),
         "product_id",
         "left"
     )
     
-    # Calculate amounts
-    fact_sales = fact_sales.withColumn(
-        "amount_before_discount",
-        F.col("quantity") * F.col("unit_price")
-    )
-    
-    fact_sales = fact_sales.withColumn(
-        "discount_amount",
-        F.col("amount_before_discount") * (F.col("discount_percent") / 100)
-    )
-    
-    fact_sales = fact_sales.withColumn(
-        "total_amount",
-        F.col("amount_before_discount") - F.col("discount_amount")
-    )
+    # Calculate amounts, reusing the same expressions so Catalyst can
+    # eliminate the common subexpressions. Each amount is rounded to cents
+    # first so total_amount is exactly the difference of the stored values
+    amount_before_discount = (F.col("quantity") * F.col("unit_price")) \
+        .cast(DecimalType(12, 2))
+    discount_amount = (amount_before_discount * (F.col("discount_percent") / 100)) \
+        .cast(DecimalType(12, 2))
     
     # Select final fact table columns and rename date to sale_date
     fact_sales = fact_sales.select(
@@ -238,16 +328,16 @@ def create_star_schema(customers_df, products_df, sales_df):
         "quantity",
         "unit_price",
         "discount_percent",
-        "amount_before_discount",
-        "discount_amount",
-        "total_amount",
+        amount_before_discount.alias("amount_before_discount"),
+        discount_amount.alias("discount_amount"),
+        (amount_before_discount - discount_amount).alias("total_amount"),
         "payment_method",
         "status"
     )
-    
-    print(f"  dim_customer: {dim_customer.count()} records")
-    print(f"  dim_product: {dim_product.count()} records")
-    print(f"  fact_sales: {fact_sales.count()} records")
+    fact_sales = fact_sales.select(*[
+        F.col(column).cast(data_type).alias(column)
+        for column, data_type in FACT_SALES_TYPES.items()
+    ])
     
     return fact_sales, dim_customer, dim_product
 
@@ -264,32 +354,16 @@ def main():
     
     # Load raw data
     print("Loading raw data...")
-    customers_raw = spark.read.csv(
-        "data/raw/customers.csv",
-        header=True,
-        inferSchema=True
-    )
-    
-    products_raw = spark.read.csv(
-        "data/raw/products.csv",
-        header=True,
-        inferSchema=True
-    )
-    
-    sales_raw = spark.read.csv(
-        "data/raw/sales.csv",
-        header=True,
-        inferSchema=True
-    )
-    
-    print(f"Loaded {customers_raw.count()} customers")
-    print(f"Loaded {products_raw.count()} products")
-    print(f"Loaded {sales_raw.count()} sales\n")
+    customers_raw = read_raw(spark, "customers", CUSTOMERS_SCHEMA)
+    products_raw = read_raw(spark, "products", PRODUCTS_SCHEMA)
+    sales_raw = read_raw(spark, "sales", SALES_SCHEMA)
     
     # Clean data
     print("Cleaning data...")
-    customers_clean = clean_customers(customers_raw)
-    products_clean = clean_products(products_raw)
+    # Cleaned dimensions feed both clean_sales and the star schema, so cache
+    # them to avoid recomputing their lineage for each consumer
+    customers_clean = clean_customers(customers_raw).cache()
+    products_clean = clean_products(products_raw).cache()
     sales_clean = clean_sales(sales_raw, customers_clean, products_clean)
     print()
     
@@ -304,23 +378,28 @@ def main():
     # Save processed data
     print("Saving processed data...")
     
-    # Use coalesce to avoid too many small files
-    dim_customer.coalesce(1).write.mode("overwrite").csv(
-        "data/processed/dim_customer",
-        header=True
-    )
+    # Write compressed Parquet in parallel; repartition (not coalesce) keeps
+    # the fact table to a few balanced files without funnelling it through
+    # a single task
+    dim_customer.write.mode("overwrite").parquet("data/processed/dim_customer")
     
-    dim_product.coalesce(1).write.mode("overwrite").csv(
-        "data/processed/dim_product",
-        header=True
-    )
+    dim_product.write.mode("overwrite").parquet("data/processed/dim_product")
     
-    fact_sales.coalesce(4).write.mode("overwrite").csv(
-        "data/processed/fact_sales",
-        header=True
+    fact_sales.repartition(4).write.mode("overwrite").parquet(
+        "data/processed/fact_sales"
     )
     
     print("Saved star schema to data/processed/")
+    
+    # Summarize once at the end by counting the saved output, instead of
+    # triggering extra actions that recompute each lineage along the way
+    for table in ["dim_customer", "dim_product", "fact_sales"]:
+        count = spark.read.parquet(f"data/processed/{table}").count()
+        print(f"  {table}: {count} records")
+    
+    customers_clean.unpersist()
+    products_clean.unpersist()
+    
     print("=" * 60)
     print("Transformation pipeline completed successfully!")
     print("=" * 60)
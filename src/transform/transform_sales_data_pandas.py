@@ -0,0 +1,307 @@
+"""
+pandas ETL transformation module for sales data.
+Applies the same cleaning rules and star schema as the PySpark pipeline,
+for datasets small enough to process in memory without a JVM.
+"""
+
+from decimal import Decimal, ROUND_HALF_UP
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import shutil
+import os
+
+# Basic email format check (same rule as the PySpark pipeline)
+EMAIL_PATTERN = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
+
+# Star schema column types, matching sql/create_tables.sql so the Parquet
+# output loads with Redshift's COPY ... FORMAT AS PARQUET
+DIM_CUSTOMER_SCHEMA = pa.schema([
+    ("customer_id", pa.int32()),
+    ("name", pa.string()),
+    ("email", pa.string()),
+    ("country", pa.string()),
+    ("registration_date", pa.date32()),
+    ("segment", pa.string()),
+    ("city", pa.string())
+])
+
+DIM_PRODUCT_SCHEMA = pa.schema([
+    ("product_id", pa.int32()),
+    ("product_name", pa.string()),
+    ("category", pa.string()),
+    ("unit_price", pa.decimal128(10, 2)),
+    ("supplier", pa.string()),
+    ("rating", pa.decimal128(3, 1))
+])
+
+FACT_SALES_SCHEMA = pa.schema([
+    ("sale_id", pa.int32()),
+    ("customer_id", pa.int32()),
+    ("product_id", pa.int32()),
+    ("sale_date", pa.date32()),
+    ("quantity", pa.int32()),
+    ("unit_price", pa.decimal128(10, 2)),
+    ("discount_percent", pa.decimal128(5, 2)),
+    ("amount_before_discount", pa.decimal128(12, 2)),
+    ("discount_amount", pa.decimal128(12, 2)),
+    ("total_amount", pa.decimal128(12, 2)),
+    ("payment_method", pa.string()),
+    ("status", pa.string())
+])
+
+
+def to_cents(values):
+    """
+    Round doubles to DECIMAL(12,2) values the way Spark's cast does.
+
+    Spark converts the double through its decimal string form and rounds
+    HALF_UP; float .round(2) would round the binary value half-to-even instead.
+    """
+    cents = Decimal("0.01")
+    return values.map(lambda v: Decimal(repr(float(v))).quantize(cents, rounding=ROUND_HALF_UP))
+
+
+def read_raw(name):
+    """Read a raw dataset, preferring the generator's Parquet output over CSV"""
+    parquet_path = f"data/raw/{name}.parquet"
+    if os.path.exists(parquet_path):
+        return pd.read_parquet(parquet_path)
+
+    return pd.read_csv(f"data/raw/{name}.csv")
+
+
+def keep_first(df, key, order_by):
+    """
+    Keep one row per key: the one with the smallest order_by value.
+
+    Ties are broken by the remaining columns in name order, like the
+    PySpark pipeline.
+    """
+    others = sorted(c for c in df.columns if c not in (key, order_by))
+    return df.sort_values([order_by, *others], na_position="first", kind="stable") \
+        .drop_duplicates(key) \
+        .sort_index()
+
+
+def clean_customers(df):
+    """
+    Clean customer data using pandas.
+
+    - Remove invalid emails
+    - Handle missing values
+    - Remove duplicates
+    """
+    print("Cleaning customers data...")
+
+    # Remove records with missing or invalid emails
+    cleaned = df[df["email"].str.match(EMAIL_PATTERN, na=False)]
+
+    # Remove duplicate emails (keep lowest customer_id)
+    cleaned = keep_first(cleaned, "email", "customer_id")
+
+    # Fill missing values
+    cleaned = cleaned.fillna({
+        "phone": "Unknown",
+        "city": "Unknown"
+    })
+
+    # Ensure proper date type
+    cleaned["registration_date"] = pd.to_datetime(cleaned["registration_date"]).dt.date
+
+    return cleaned
+
+
+def clean_products(df):
+    """
+    Clean product data using pandas.
+
+    - Fix negative prices and stock
+    - Handle missing values
+    - Validate ratings
+    """
+    print("Cleaning products data...")
+
+    # Remove products with non-positive prices
+    cleaned = df[df["unit_price"] > 0].copy()
+
+    # Fix negative stock (set to 0)
+    cleaned["stock_quantity"] = cleaned["stock_quantity"].clip(lower=0)
+
+    # Fill missing supplier
+    cleaned = cleaned.fillna({"supplier": "Unknown"})
+
+    # Fill missing weight with category median
+    weight_medians = cleaned.groupby("category")["weight_kg"].transform("median")
+    cleaned["weight_kg"] = cleaned["weight_kg"].fillna(weight_medians)
+
+    # Fix invalid ratings (cap between 0 and 5)
+    cleaned["rating"] = cleaned["rating"].clip(0.0, 5.0)
+
+    return cleaned
+
+
+def clean_sales(df, valid_customers_df, valid_products_df):
+    """
+    Clean sales data using pandas.
+
+    - Remove orphaned foreign keys
+    - Fix negative quantities
+    - Handle missing/invalid dates
+    - Fix invalid discounts
+    - Remove duplicates
+    """
+    print("Cleaning sales data...")
+
+    # Remove missing and future dates
+    dates = pd.to_datetime(df["date"])
+    cleaned = df.assign(date=dates)
+    cleaned = cleaned[dates.notna() & (dates <= pd.Timestamp.today())]
+
+    # Remove orphaned customer_ids and product_ids
+    cleaned = cleaned[
+        cleaned["customer_id"].isin(valid_customers_df["customer_id"])
+        & cleaned["product_id"].isin(valid_products_df["product_id"])
+    ]
+
+    # Remove negative quantities
+    cleaned = cleaned[cleaned["quantity"] > 0].copy()
+
+    # Fix invalid discounts (cap at 100%)
+    cleaned["discount_percent"] = cleaned["discount_percent"].clip(0, 100)
+
+    # Remove duplicate sale_ids (keep earliest date)
+    cleaned = keep_first(cleaned, "sale_id", "date")
+
+    cleaned["date"] = cleaned["date"].dt.date
+
+    return cleaned
+
+
+def create_star_schema(customers_df, products_df, sales_df):
+    """
+    Create star schema with fact and dimension tables.
+
+    Returns:
+        Tuple of (fact_sales, dim_customer, dim_product)
+    """
+    print("Creating star schema...")
+
+    # Dimension: Customers
+    dim_customer = customers_df[[
+        "customer_id",
+        "name",
+        "email",
+        "country",
+        "registration_date",
+        "segment",
+        "city"
+    ]]
+
+    # Dimension: Products
+    dim_product = products_df[[
+        "product_id",
+        "product_name",
+        "category",
+        "unit_price",
+        "supplier",
+        "rating"
+    ]]
+
+    # Fact: Sales with calculated metrics
+    fact_sales = sales_df.merge(
+        products_df[["product_id", "unit_price"]],
+        on="product_id",
+        how="left"
+    )
+
+    # Calculate amounts, rounded to cents so total_amount is exactly the
+    # difference of the stored values (same arithmetic as the PySpark pipeline)
+    amount_before_discount = to_cents(fact_sales["quantity"] * fact_sales["unit_price"])
+    discount_amount = to_cents(
+        amount_before_discount.astype(float) * (fact_sales["discount_percent"] / 100)
+    )
+
+    fact_sales = fact_sales.assign(
+        discount_percent=fact_sales["discount_percent"].astype(float),  # DECIMAL(5,2)
+        amount_before_discount=amount_before_discount,
+        discount_amount=discount_amount,
+        total_amount=amount_before_discount - discount_amount
+    )
+
+    # Select final fact table columns and rename date to sale_date
+    fact_sales = fact_sales.rename(columns={"date": "sale_date"})[[
+        "sale_id",
+        "customer_id",
+        "product_id",
+        "sale_date",
+        "quantity",
+        "unit_price",
+        "discount_percent",
+        "amount_before_discount",
+        "discount_amount",
+        "total_amount",
+        "payment_method",
+        "status"
+    ]]
+
+    return fact_sales, dim_customer, dim_product
+
+
+def write_table(df, path, schema):
+    """Write a table as a single Parquet part file, matching the PySpark output layout"""
+    shutil.rmtree(path, ignore_errors=True)
+    os.makedirs(path)
+    table = pa.Table.from_pandas(df, preserve_index=False).cast(schema)
+    pq.write_table(table, f"{path}/part-00000.snappy.parquet", compression="snappy")
+
+
+def main():
+    """Run the complete pandas ETL transformation pipeline"""
+    print("=" * 60)
+    print("pandas ETL Transformation Pipeline")
+    print("=" * 60)
+
+    # Load raw data
+    print("Loading raw data...")
+    customers_raw = read_raw("customers")
+    products_raw = read_raw("products")
+    sales_raw = read_raw("sales")
+
+    # Clean data
+    print("Cleaning data...")
+    customers_clean = clean_customers(customers_raw)
+    products_clean = clean_products(products_raw)
+    sales_clean = clean_sales(sales_raw, customers_clean, products_clean)
+    print()
+
+    # Create star schema
+    fact_sales, dim_customer, dim_product = create_star_schema(
+        customers_clean,
+        products_clean,
+        sales_clean
+    )
+    print()
+
+    # Save processed data
+    print("Saving processed data...")
+    tables = {
+        "dim_customer": (dim_customer, DIM_CUSTOMER_SCHEMA),
+        "dim_product": (dim_product, DIM_PRODUCT_SCHEMA),
+        "fact_sales": (fact_sales, FACT_SALES_SCHEMA)
+    }
+    for table, (df, schema) in tables.items():
+        write_table(df, f"data/processed/{table}", schema)
+
+    print("Saved star schema to data/processed/")
+
+    for table, (df, _) in tables.items():
+        print(f"  {table}: {len(df)} records")
+
+    print("=" * 60)
+    print("Transformation pipeline completed successfully!")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()